@@ -1,134 +1,268 @@
+import hashlib
 import json
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.lines import Line2D
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+LIMITE_NUMEXPR = 10_000
+LIMITE_STREAMING = 100 * 1024 * 1024
+TAMANHO_LOTE_STREAMING = 100_000
+
+DPI_GRAFICOS = 150
+OPCOES_PNG = {'optimize': True}
+
+ESQUEMA_RESULTADOS = {
+    'versao': 'category',
+    'largura': 'int32',
+    'altura': 'int32',
+    'iteracoes': 'int32',
+    'threads': 'int16',
+    'workers': 'int16',
+    'tempo_execucao': 'float64',
+    'tempo_stdev': 'float64'
+}
+
+
+def aplicar_esquema(df):
+    return df.astype({coluna: tipo for coluna, tipo in ESQUEMA_RESULTADOS.items() if coluna in df.columns})
+
+
+def carregar_lotes_em_fluxo(caminho_arquivo, tamanho_lote=TAMANHO_LOTE_STREAMING):
+    with open(caminho_arquivo, 'rb') as f:
+        registros = ijson.items(f, 'item', use_float=True)
+        lote = list(islice(registros, tamanho_lote))
+        while lote:
+            yield aplicar_esquema(pd.DataFrame.from_records(lote))
+            lote = list(islice(registros, tamanho_lote))
+
+
+def concatenar_lotes(lotes):
+    if not lotes:
+        return aplicar_esquema(pd.DataFrame(columns=list(ESQUEMA_RESULTADOS)))
+    
+    for coluna in lotes[0].select_dtypes('category').columns:
+        categorias = pd.api.types.union_categoricals([lote[coluna] for lote in lotes]).categories
+        for lote in lotes:
+            lote[coluna] = lote[coluna].cat.set_categories(categorias)
+    return pd.concat(lotes, ignore_index=True)
+
 
 def carregar_resultados(caminho_arquivo):
-    with open(caminho_arquivo, 'r') as f:
-        return json.load(f)
+    if ijson and os.path.getsize(caminho_arquivo) > LIMITE_STREAMING:
+        return concatenar_lotes(list(carregar_lotes_em_fluxo(caminho_arquivo)))
+    
+    with open(caminho_arquivo, 'rb') as f:
+        conteudo = f.read()
+    registros = orjson.loads(conteudo) if orjson else json.loads(conteudo)
+    return aplicar_esquema(pd.DataFrame.from_records(registros))
+
+
+def prefixo_cache(caminho_arquivo):
+    return f"cache_{hashlib.blake2b(os.path.abspath(caminho_arquivo).encode(), digest_size=4).hexdigest()}_"
 
 
-def calcular_speedup(resultados):
-    tempos_sequenciais = {}
-    for resultado in resultados:
-        if resultado['versao'] == 'sequencial':
-            chave = (resultado['largura'], resultado['altura'])
-            tempos_sequenciais[chave] = resultado['tempo_execucao']
+def chave_cache(caminho_arquivo):
+    resumo = hashlib.blake2b(digest_size=16)
+    with open(__file__, 'rb') as f:
+        resumo.update(f.read())
+    with open(caminho_arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            resumo.update(bloco)
     
-    for resultado in resultados:
-        chave = (resultado['largura'], resultado['altura'])
-        if chave in tempos_sequenciais:
-            resultado['speedup'] = tempos_sequenciais[chave] / resultado['tempo_execucao']
-        else:
-            resultado['speedup'] = None
-    
-    return resultados
-
-
-def calcular_eficiencia(resultados):
-    for resultado in resultados:
-        if resultado['speedup'] is not None:
-            if resultado['versao'] == 'paralelo':
-                recursos = resultado['threads']
-            elif resultado['versao'] == 'distribuido':
-                recursos = resultado['workers']
-            else:
-                recursos = 1
-            
-            resultado['eficiencia'] = resultado['speedup'] / recursos if recursos > 0 else 0
+    return f"{prefixo_cache(caminho_arquivo)}{int(os.path.getmtime(caminho_arquivo))}_{resumo.hexdigest()}"
+
+
+def remover_caches_antigos(diretorio, caminho_arquivo):
+    prefixo = prefixo_cache(caminho_arquivo)
+    for nome in os.listdir(diretorio):
+        if nome.startswith(prefixo) and nome.endswith('.pkl'):
+            os.remove(os.path.join(diretorio, nome))
+
+
+def salvar_resultados(df, caminho_arquivo):
+    registros = df.replace({np.nan: None}).to_dict(orient='records')
+    
+    with open(caminho_arquivo, 'wb') as f:
+        if orjson:
+            f.write(orjson.dumps(registros, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
         else:
-            resultado['eficiencia'] = None
+            f.write(json.dumps(registros, indent=2).encode())
+
+
+def calcular_speedup(df):
+    sequenciais = df.loc[df['versao'] == 'sequencial', ['largura', 'altura', 'tempo_execucao']]
+    tempos_sequenciais = sequenciais.drop_duplicates(['largura', 'altura'], keep='last').set_index(
+        ['largura', 'altura']
+    )['tempo_execucao']
+    
+    tempo_seq = tempos_sequenciais.reindex(
+        pd.MultiIndex.from_arrays([df['largura'], df['altura']])
+    ).to_numpy(dtype=np.float64)
+    tempos = df['tempo_execucao'].to_numpy(dtype=np.float64)
     
-    return resultados
+    if len(df) > LIMITE_NUMEXPR:
+        df['speedup'] = pd.eval('tempo_seq / tempos')
+    else:
+        df['speedup'] = tempo_seq / tempos
+    
+    return df
 
 
-def gerar_tabela_detalhada(resultados):
-    df = pd.DataFrame(resultados)
+def calcular_eficiencia(df):
+    versoes = df['versao'].to_numpy()
+    recursos = np.where(
+        versoes == 'paralelo',
+        df['threads'].to_numpy(),
+        np.where(versoes == 'distribuido', df['workers'].to_numpy(), 1)
+    ).astype(np.float64)
+    speedups = df['speedup'].to_numpy(dtype=np.float64)
+    
+    validos = np.isfinite(speedups)
+    if len(df) > LIMITE_NUMEXPR:
+        df['eficiencia'] = np.where(
+            validos & (recursos > 0),
+            pd.eval('speedups / recursos'),
+            np.where(validos, 0.0, np.nan)
+        )
+    else:
+        df['eficiencia'] = np.divide(
+            speedups, recursos,
+            out=np.where(validos, 0.0, np.nan),
+            where=validos & (recursos > 0)
+        )
     
+    return df
+
+
+def gerar_tabela_detalhada(df):
     df = df[df['speedup'].notna()]
     
+    linhas = (
+        df['versao'].astype(str).str.ljust(15) + ' ' +
+        (df['largura'].astype(int).astype(str) + 'x' + df['altura'].astype(int).astype(str)).str.ljust(15) + ' ' +
+        df['threads'].astype(int).astype(str).str.ljust(10) + ' ' +
+        df['workers'].astype(int).astype(str).str.ljust(15) + ' ' +
+        df['tempo_execucao'].map('{:<15.4f}'.format) + ' ' +
+        df['speedup'].map('{:<12.4f}'.format) + ' ' +
+        df['eficiencia'].map('{:<12.4f}'.format)
+    )
+    
     print("\n" + "="*100)
     print("TABELA DETALHADA DE DESEMPENHO")
     print("="*100)
     print(f"{'Versão':<15} {'Tamanho':<15} {'Threads':<10} {'Workers':<15} "
           f"{'Tempo (s)':<15} {'Speedup':<12} {'Eficiência':<12}")
     print("-"*100)
-    
-    for _, linha in df.iterrows():
-        tamanho_str = f"{int(linha['largura'])}x{int(linha['altura'])}"
-        print(f"{linha['versao']:<15} {tamanho_str:<15} {int(linha['threads']):<10} "
-              f"{int(linha['workers']):<15} {linha['tempo_execucao']:<15.4f} "
-              f"{linha['speedup']:<12.4f} {linha['eficiencia']:<12.4f}")
+    if len(linhas):
+        print("\n".join(linhas))
     
     return df
 
 
-def plotar_comparacao_eficiencia(df, diretorio_saida):
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+def adicionar_series(ax, series):
+    if not series:
+        return []
+    
+    paleta = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    cores = to_rgba_array([cor or paleta[i % len(paleta)] for i, (_, _, _, cor) in enumerate(series)])
+    segmentos = [np.column_stack((x, y)) for x, y, _, _ in series]
+    
+    ax.add_collection(LineCollection(segmentos, colors=cores))
+    pontos = np.concatenate(segmentos)
+    ax.scatter(pontos[:, 0], pontos[:, 1], marker='o', zorder=3,
+               c=np.repeat(cores, [len(segmento) for segmento in segmentos], axis=0))
+    ax.autoscale_view()
+    
+    return [Line2D([], [], color=cor, marker='o', label=rotulo)
+            for (_, _, rotulo, _), cor in zip(series, cores)]
+
+
+def separar_versoes(df):
+    codigos = df['versao'].cat.codes.to_numpy()
+    categorias = list(df['versao'].cat.categories)
+    
+    return {
+        versao: df[codigos == categorias.index(versao)] if versao in categorias else df.iloc[:0]
+        for versao in ['sequencial', 'paralelo', 'distribuido']
+    }
+
+
+def plotar_comparacao_eficiencia(df_por_versao, diretorio_saida):
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
     
-    df_paralelo = df[df['versao'] == 'paralelo']
+    df_paralelo = df_por_versao['paralelo']
     if not df_paralelo.empty:
-        tamanhos = df_paralelo[['largura', 'altura']].drop_duplicates()
-        for _, linha_tamanho in tamanhos.iterrows():
-            dados_tamanho = df_paralelo[
-                (df_paralelo['largura'] == linha_tamanho['largura']) & 
-                (df_paralelo['altura'] == linha_tamanho['altura'])
-            ]
-            dados_tamanho = dados_tamanho.sort_values('threads')
-            rotulo = f"{int(linha_tamanho['largura'])}x{int(linha_tamanho['altura'])}"
-            ax1.plot(dados_tamanho['threads'], dados_tamanho['eficiencia'], 
-                    marker='o', label=rotulo)
+        grupos = df_paralelo.sort_values(['largura', 'altura', 'threads']).groupby(['largura', 'altura'], sort=False)
+        series = [
+            (dados_tamanho['threads'].to_numpy(copy=False), dados_tamanho['eficiencia'].to_numpy(copy=False),
+             f"{int(largura)}x{int(altura)}", None)
+            for (largura, altura), dados_tamanho in grupos
+        ]
+        legenda = adicionar_series(ax1, series)
         
         ax1.set_xlabel('Número de Threads')
         ax1.set_ylabel('Eficiência')
         ax1.set_title('Eficiência vs Threads (Paralelo)')
-        ax1.legend()
+        ax1.legend(handles=legenda)
         ax1.grid(True, alpha=0.3)
         ax1.axhline(y=1.0, color='r', linestyle='--', alpha=0.5, label='Eficiência Ideal')
     
-    df_distribuido = df[df['versao'] == 'distribuido']
+    df_distribuido = df_por_versao['distribuido']
     if not df_distribuido.empty:
-        tamanhos = df_distribuido[['largura', 'altura']].drop_duplicates()
-        for _, linha_tamanho in tamanhos.iterrows():
-            dados_tamanho = df_distribuido[
-                (df_distribuido['largura'] == linha_tamanho['largura']) & 
-                (df_distribuido['altura'] == linha_tamanho['altura'])
-            ]
-            dados_tamanho = dados_tamanho.sort_values('workers')
-            rotulo = f"{int(linha_tamanho['largura'])}x{int(linha_tamanho['altura'])}"
-            ax2.plot(dados_tamanho['workers'], dados_tamanho['eficiencia'], 
-                    marker='o', label=rotulo)
+        grupos = df_distribuido.sort_values(['largura', 'altura', 'workers']).groupby(['largura', 'altura'], sort=False)
+        series = [
+            (dados_tamanho['workers'].to_numpy(copy=False), dados_tamanho['eficiencia'].to_numpy(copy=False),
+             f"{int(largura)}x{int(altura)}", None)
+            for (largura, altura), dados_tamanho in grupos
+        ]
+        legenda = adicionar_series(ax2, series)
         
         ax2.set_xlabel('Número de Workers')
         ax2.set_ylabel('Eficiência')
         ax2.set_title('Eficiência vs Workers (Distribuído)')
-        ax2.legend()
+        ax2.legend(handles=legenda)
         ax2.grid(True, alpha=0.3)
         ax2.axhline(y=1.0, color='r', linestyle='--', alpha=0.5, label='Eficiência Ideal')
     
-    plt.tight_layout()
     caminho_arquivo = os.path.join(diretorio_saida, 'comparacao_eficiencia.png')
-    plt.savefig(caminho_arquivo, dpi=300)
+    plt.savefig(caminho_arquivo, dpi=DPI_GRAFICOS, pil_kwargs=OPCOES_PNG)
     print(f"\nGráfico de eficiência salvo em {caminho_arquivo}")
     plt.close()
 
 
-def plotar_escalabilidade(df, diretorio_saida):
-    fig, ax = plt.subplots(figsize=(10, 6))
+def plotar_escalabilidade(df_por_versao, diretorio_saida):
+    fig, ax = plt.subplots(figsize=(10, 6), constrained_layout=True)
     
     versoes = ['paralelo', 'distribuido']
     cores = {'paralelo': 'green', 'distribuido': 'red'}
+    series = []
     
     for versao in versoes:
-        df_versao = df[df['versao'] == versao]
+        df_versao = df_por_versao[versao]
         if df_versao.empty:
             continue
         
-        tamanho_maximo = df_versao[['largura', 'altura']].apply(lambda x: x['largura'] * x['altura'], axis=1).max()
-        df_tamanho_maximo = df_versao[df_versao.apply(lambda x: x['largura'] * x['altura'] == tamanho_maximo, axis=1)]
+        df_tamanho_maximo = df_versao[df_versao['area'] == df_versao['area'].max()]
         
         if versao == 'paralelo':
             recursos = df_tamanho_maximo['threads'].values
@@ -137,49 +271,67 @@ def plotar_escalabilidade(df, diretorio_saida):
         
         speedups = df_tamanho_maximo['speedup'].values
         
-        ax.plot(recursos, speedups, marker='o', label=versao, color=cores[versao])
+        series.append((recursos, speedups, versao, cores[versao]))
     
-    if not df.empty:
+    legenda = adicionar_series(ax, series)
+    
+    if any(not df_versao.empty for df_versao in df_por_versao.values()):
+        df_paralelo = df_por_versao['paralelo']
+        df_distribuido = df_por_versao['distribuido']
         max_recursos = max(
-            df[df['versao'] == 'paralelo']['threads'].max() if not df[df['versao'] == 'paralelo'].empty else 0,
-            df[df['versao'] == 'distribuido']['workers'].max() if not df[df['versao'] == 'distribuido'].empty else 0
+            df_paralelo['threads'].max() if not df_paralelo.empty else 0,
+            df_distribuido['workers'].max() if not df_distribuido.empty else 0
         )
         ideal = np.arange(1, max_recursos + 1)
-        ax.plot(ideal, ideal, 'k--', alpha=0.5, label='Ideal (Linear)')
+        legenda += ax.plot(ideal, ideal, 'k--', alpha=0.5, label='Ideal (Linear)')
     
     ax.set_xlabel('Número de Recursos (Threads/Workers)')
     ax.set_ylabel('Speedup')
     ax.set_title('Escalabilidade')
-    ax.legend()
+    ax.legend(handles=legenda)
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
     caminho_arquivo = os.path.join(diretorio_saida, 'escalabilidade.png')
-    plt.savefig(caminho_arquivo, dpi=300)
+    plt.savefig(caminho_arquivo, dpi=DPI_GRAFICOS, pil_kwargs=OPCOES_PNG)
     print(f"Gráfico de escalabilidade salvo em {caminho_arquivo}")
     plt.close()
 
 
+def executar_grafico(tarefa):
+    funcao_grafico, df_por_versao, diretorio_saida = tarefa
+    funcao_grafico(df_por_versao, diretorio_saida)
+
+
 def gerar_estatisticas(df):
     print("\n" + "="*60)
     print("ESTATÍSTICAS RESUMIDAS")
     print("="*60)
     
+    estatisticas = df.groupby('versao', observed=True).agg(
+        tempo_medio=('tempo_execucao', 'mean'),
+        tempo_min=('tempo_execucao', 'min'),
+        tempo_max=('tempo_execucao', 'max'),
+        speedup_medio=('speedup', 'mean'),
+        speedup_max=('speedup', 'max'),
+        eficiencia_media=('eficiencia', 'mean'),
+        eficiencia_max=('eficiencia', 'max')
+    )
+    
     for versao in ['sequencial', 'paralelo', 'distribuido']:
-        df_versao = df[df['versao'] == versao]
-        if df_versao.empty:
+        if versao not in estatisticas.index:
             continue
         
+        linha = estatisticas.loc[versao]
         print(f"\n{versao.upper()}:")
-        print(f"  Tempo médio: {df_versao['tempo_execucao'].mean():.4f} s")
-        print(f"  Tempo mínimo: {df_versao['tempo_execucao'].min():.4f} s")
-        print(f"  Tempo máximo: {df_versao['tempo_execucao'].max():.4f} s")
+        print(f"  Tempo médio: {linha['tempo_medio']:.4f} s")
+        print(f"  Tempo mínimo: {linha['tempo_min']:.4f} s")
+        print(f"  Tempo máximo: {linha['tempo_max']:.4f} s")
         
         if versao != 'sequencial':
-            print(f"  Speedup médio: {df_versao['speedup'].mean():.4f}")
-            print(f"  Speedup máximo: {df_versao['speedup'].max():.4f}")
-            print(f"  Eficiência média: {df_versao['eficiencia'].mean():.4f}")
-            print(f"  Eficiência máxima: {df_versao['eficiencia'].max():.4f}")
+            print(f"  Speedup médio: {linha['speedup_medio']:.4f}")
+            print(f"  Speedup máximo: {linha['speedup_max']:.4f}")
+            print(f"  Eficiência média: {linha['eficiencia_media']:.4f}")
+            print(f"  Eficiência máxima: {linha['eficiencia_max']:.4f}")
 
 
 def main():
@@ -188,6 +340,8 @@ def main():
                        help='Arquivo de resultados JSON')
     parser.add_argument('--output-dir', type=str, default='resultados',
                        help='Diretório para salvar gráficos')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Recalcular as métricas mesmo que exista cache para o arquivo de entrada')
     
     args = parser.parse_args()
     
@@ -196,23 +350,37 @@ def main():
         print("Execute primeiro: python teste_desempenho.py")
         return
     
-    print(f"Carregando resultados de {args.input}...")
-    resultados = carregar_resultados(args.input)
+    os.makedirs(args.output_dir, exist_ok=True)
+    caminho_cache = os.path.join(args.output_dir, f'{chave_cache(args.input)}.pkl')
     
-    print("Calculando métricas...")
-    resultados = calcular_speedup(resultados)
-    resultados = calcular_eficiencia(resultados)
+    if not args.no_cache and os.path.exists(caminho_cache):
+        print(f"Usando métricas em cache de {caminho_cache}...")
+        resultados = pd.read_pickle(caminho_cache)
+    else:
+        print(f"Carregando resultados de {args.input}...")
+        resultados = carregar_resultados(args.input)
+        resultados['area'] = resultados['largura'].astype(np.int64) * resultados['altura'].astype(np.int64)
+        
+        print("Calculando métricas...")
+        resultados = calcular_speedup(resultados)
+        resultados = calcular_eficiencia(resultados)
+        remover_caches_antigos(args.output_dir, args.input)
+        resultados.to_pickle(caminho_cache)
     
     df = gerar_tabela_detalhada(resultados)
     gerar_estatisticas(df)
     
     print("\nGerando gráficos...")
-    plotar_comparacao_eficiencia(df, args.output_dir)
-    plotar_escalabilidade(df, args.output_dir)
+    df_por_versao = separar_versoes(df)
+    tarefas = [
+        (plotar_comparacao_eficiencia, df_por_versao, args.output_dir),
+        (plotar_escalabilidade, df_por_versao, args.output_dir)
+    ]
+    with ProcessPoolExecutor(max_workers=len(tarefas)) as executor:
+        list(executor.map(executar_grafico, tarefas))
     
     arquivo_saida = os.path.join(args.output_dir, 'resultados_benchmark_analisados.json')
-    with open(arquivo_saida, 'w') as f:
-        json.dump(resultados, f, indent=2)
+    salvar_resultados(resultados.drop(columns='area'), arquivo_saida)
     print(f"\nResultados analisados salvos em {arquivo_saida}")
     
     print("\n" + "="*60)
@@ -1,44 +1,247 @@
 import argparse
-import time
 import json
 import csv
+import statistics
+import subprocess
+import sys
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache, partial
+from operator import itemgetter
 from typing import List, Dict, Tuple
-import matplotlib.pyplot as plt
 import numpy as np
 
 from sequencial import executar_simulacao_sequencial
 from paralelo import executar_simulacao_paralela
-from distribuido import executar_servidor_distribuido, executar_worker_distribuido
-import subprocess
-import sys
-import os
+from distribuido import criar_servidor, aceitar_workers, executar_simulacao_com_workers, encerrar_workers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+CAMPOS_RESULTADO = ['versao', 'largura', 'altura', 'iteracoes', 'threads', 'workers', 'tempo_execucao', 'tempo_stdev']
+obter_linha_csv = itemgetter(*CAMPOS_RESULTADO)
+ITERACOES_AQUECIMENTO = 50
+TIPOS_COLUNAS = {
+    'largura': 'q',
+    'altura': 'q',
+    'iteracoes': 'q',
+    'threads': 'q',
+    'workers': 'q',
+    'tempo_execucao': 'd',
+    'tempo_stdev': 'd'
+}
+AMBIENTE_THREAD_UNICA = {
+    'OPENBLAS_NUM_THREADS': '1',
+    'MKL_NUM_THREADS': '1',
+    'OMP_NUM_THREADS': '1'
+}
+
+
+def medir_repeticoes(funcao, args, repeticoes, detalhado=False, aquecimento=0, opcoes=None) -> Tuple[float, float]:
+    opcoes = opcoes or {}
+    largura, altura, iteracoes, *extras = args
+    for _ in range(aquecimento):
+        funcao(largura, altura, min(iteracoes, ITERACOES_AQUECIMENTO), *extras, detalhado=False, **opcoes)
+    
+    tempos = [
+        funcao(*args, detalhado=(detalhado and repeticao == 0), **opcoes) for repeticao in range(repeticoes)
+    ]
+    tempo_mediano = statistics.median(tempos)
+    tempo_stdev = statistics.stdev(tempos) if len(tempos) > 1 else 0.0
+    return tempo_mediano, tempo_stdev
+
+
+def executar_configuracao(versao, largura, altura, iteracoes, num_threads, repeticoes, detalhado=False,
+                          aquecimento=0, nucleos=None, opcoes=None) -> Dict:
+    fixar_afinidade(0, nucleos)
+    if versao == 'sequencial':
+        tempo_execucao, tempo_stdev = medir_repeticoes(
+            executar_simulacao_sequencial, (largura, altura, iteracoes), repeticoes, detalhado, aquecimento, opcoes
+        )
+    else:
+        tempo_execucao, tempo_stdev = medir_repeticoes(
+            executar_simulacao_paralela, (largura, altura, iteracoes, num_threads), repeticoes, detalhado, aquecimento,
+            opcoes
+        )
+    
+    return {
+        'versao': versao,
+        'largura': largura,
+        'altura': altura,
+        'iteracoes': iteracoes,
+        'threads': num_threads,
+        'workers': 1,
+        'tempo_execucao': tempo_execucao,
+        'tempo_stdev': tempo_stdev
+    }
+
+
+def aguardar_processos(processos: List[subprocess.Popen], tempo_limite=5.0):
+    prazo = time.monotonic() + tempo_limite
+    for proc in processos:
+        try:
+            proc.wait(timeout=max(0.0, prazo - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    
+    for proc in processos:
+        proc.wait()
+
+
+def obter_nucleos_disponiveis() -> List[int]:
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    
+    try:
+        import psutil
+        return sorted(psutil.Process().cpu_affinity())
+    except (ImportError, AttributeError, OSError):
+        return []
+
+
+def fixar_afinidade(pid, nucleos: List[int]):
+    if not nucleos:
+        return
+    
+    try:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(pid, set(nucleos))
+        else:
+            import psutil
+            psutil.Process(pid).cpu_affinity(list(nucleos))
+    except (ImportError, AttributeError, OSError):
+        pass
+
+
+@lru_cache(maxsize=1)
+def _obter_plt():
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+    
+    plt.ioff()
+    return plt
+
+
+class ResultadosBenchmark:
+    
+    def __init__(self):
+        self.colunas = {
+            campo: (array(TIPOS_COLUNAS[campo]) if campo in TIPOS_COLUNAS else [])
+            for campo in CAMPOS_RESULTADO
+        }
+    
+    def adicionar(self, resultado: Dict):
+        for campo, valores in self.colunas.items():
+            valores.append(resultado[campo])
+    
+    def coluna(self, campo):
+        return np.array(self.colunas[campo])
+    
+    def __len__(self):
+        return len(self.colunas['versao'])
+    
+    def __iter__(self):
+        campos = list(self.colunas)
+        for linha in zip(*self.colunas.values()):
+            yield dict(zip(campos, linha))
 
 
 class ExecutorBenchmark:
     
-    def __init__(self, diretorio_saida='resultados'):
+    def __init__(self, diretorio_saida='resultados', repeticoes=5, processos=1, depurar=False, detalhado=False,
+                 aquecimento=1, memoria_compartilhada=False, dtype=None, iteracoes_fixas=False):
         self.diretorio_saida = diretorio_saida
+        self.opcoes_simulacao = {'dtype': dtype}
+        if iteracoes_fixas:
+            self.opcoes_simulacao['limite_convergencia'] = None
+        self.memoria_compartilhada = memoria_compartilhada
+        self.depurar = depurar
+        self.detalhado = detalhado
+        self.aquecimento = max(0, aquecimento)
+        self.repeticoes = max(1, repeticoes)
+        self.processos = max(1, processos or 1)
         os.makedirs(diretorio_saida, exist_ok=True)
-        self.resultados = []
+        self.resultados = ResultadosBenchmark()
+        self.arquivo_csv = None
+        self.escritor_csv = None
+    
+    def _registrar_resultado(self, resultado: Dict):
+        self.resultados.adicionar(resultado)
+        
+        if self.escritor_csv is None:
+            caminho_arquivo = os.path.join(self.diretorio_saida, 'resultados_benchmark.csv')
+            self.arquivo_csv = open(caminho_arquivo, 'w', newline='')
+            self.escritor_csv = csv.writer(self.arquivo_csv)
+            self.escritor_csv.writerow(CAMPOS_RESULTADO)
+        
+        self.escritor_csv.writerow(obter_linha_csv(resultado))
+        self.arquivo_csv.flush()
+    
+    def _executar_configuracoes(self, configuracoes: List[Tuple[str, int, int, int, int]]):
+        todos_nucleos = obter_nucleos_disponiveis()
+        if self.processos == 1:
+            for configuracao in configuracoes:
+                self._anunciar_configuracao(configuracao)
+                self._concluir_configuracao(executar_configuracao(
+                    *configuracao, self.repeticoes, self.detalhado, self.aquecimento, todos_nucleos,
+                    self.opcoes_simulacao
+                ))
+            return
+        
+        pendentes = list(configuracoes)
+        em_execucao = {}
+        nucleos_ocupados = 0
+        capacidade = len(todos_nucleos) or os.cpu_count() or 1
+        nucleos_livres = list(todos_nucleos)
+        
+        with ProcessPoolExecutor(max_workers=self.processos) as executor:
+            while pendentes or em_execucao:
+                while pendentes and len(em_execucao) < self.processos and (
+                    not em_execucao or nucleos_ocupados + pendentes[0][4] <= capacidade
+                ):
+                    configuracao = pendentes.pop(0)
+                    num_threads = configuracao[4]
+                    self._anunciar_configuracao(configuracao)
+                    nucleos = nucleos_livres[:num_threads] if len(nucleos_livres) >= num_threads else []
+                    del nucleos_livres[:len(nucleos)]
+                    futuro = executor.submit(
+                        executar_configuracao, *configuracao, self.repeticoes, self.detalhado, self.aquecimento,
+                        nucleos or todos_nucleos, self.opcoes_simulacao
+                    )
+                    em_execucao[futuro] = (num_threads, nucleos)
+                    nucleos_ocupados += num_threads
+                
+                concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    num_threads, nucleos = em_execucao.pop(futuro)
+                    nucleos_ocupados -= num_threads
+                    nucleos_livres = sorted(nucleos_livres + nucleos)
+                    self._concluir_configuracao(futuro.result())
+    
+    def _anunciar_configuracao(self, configuracao: Tuple[str, int, int, int, int]):
+        versao, largura, altura, iteracoes, num_threads = configuracao
+        print(f"\nTestando {versao} {largura}x{altura} com {num_threads} threads...")
+    
+    def _concluir_configuracao(self, resultado: Dict):
+        print(f"  {resultado['versao']} {resultado['largura']}x{resultado['altura']} "
+              f"({resultado['threads']} threads): mediana {resultado['tempo_execucao']:.4f} segundos "
+              f"(desvio padrão: {resultado['tempo_stdev']:.4f})")
+        self._registrar_resultado(resultado)
     
     def executar_benchmark_sequencial(self, tamanhos: List[Tuple[int, int]], iteracoes: int):
         print("\n" + "="*60)
         print("BENCHMARK SEQUENCIAL")
         print("="*60)
         
-        for largura, altura in tamanhos:
-            print(f"\nTestando tamanho {largura}x{altura}...")
-            tempo_execucao = executar_simulacao_sequencial(largura, altura, iteracoes, detalhado=True)
-            
-            self.resultados.append({
-                'versao': 'sequencial',
-                'largura': largura,
-                'altura': altura,
-                'iteracoes': iteracoes,
-                'threads': 1,
-                'workers': 1,
-                'tempo_execucao': tempo_execucao
-            })
+        self._executar_configuracoes([
+            ('sequencial', largura, altura, iteracoes, 1) for largura, altura in tamanhos
+        ])
     
     def executar_benchmark_paralelo(self, tamanhos: List[Tuple[int, int]], iteracoes: int, 
                                contagens_threads: List[int]):
@@ -46,22 +249,33 @@ class ExecutorBenchmark:
         print("BENCHMARK PARALELO")
         print("="*60)
         
-        for largura, altura in tamanhos:
-            for num_threads in contagens_threads:
-                print(f"\nTestando tamanho {largura}x{altura} com {num_threads} threads...")
-                tempo_execucao = executar_simulacao_paralela(
-                    largura, altura, iteracoes, num_threads, detalhado=True
-                )
-                
-                self.resultados.append({
-                    'versao': 'paralelo',
-                    'largura': largura,
-                    'altura': altura,
-                    'iteracoes': iteracoes,
-                    'threads': num_threads,
-                    'workers': 1,
-                    'tempo_execucao': tempo_execucao
-                })
+        self._executar_configuracoes([
+            ('paralelo', largura, altura, iteracoes, num_threads)
+            for largura, altura in tamanhos
+            for num_threads in contagens_threads
+        ])
+    
+    def _iniciar_worker(self, porta, nome_log, nucleo=None):
+        saida = subprocess.DEVNULL
+        if self.depurar:
+            saida = open(os.path.join(self.diretorio_saida, nome_log), 'wb')
+        
+        try:
+            processo = subprocess.Popen(
+                [sys.executable, 'distribuido.py', 'worker', 'localhost', str(porta)],
+                stdout=saida,
+                stderr=subprocess.STDOUT,
+                close_fds=True,
+                start_new_session=(os.name == 'posix'),
+                env={**os.environ, **AMBIENTE_THREAD_UNICA}
+            )
+        finally:
+            if saida is not subprocess.DEVNULL:
+                saida.close()
+        
+        if nucleo is not None:
+            fixar_afinidade(processo.pid, [nucleo])
+        return processo
     
     def executar_benchmark_distribuido(self, tamanhos: List[Tuple[int, int]], iteracoes: int,
                                   contagens_workers: List[int], porta_inicial=8888):
@@ -69,58 +283,75 @@ class ExecutorBenchmark:
         print("BENCHMARK DISTRIBUÍDO")
         print("="*60)
         
-        for largura, altura in tamanhos:
+        contagens_workers = sorted(set(contagens_workers))
+        if not contagens_workers:
+            return
+        
+        socket_servidor = criar_servidor(porta_inicial, contagens_workers[-1])
+        processos_workers = []
+        sockets_workers = []
+        
+        nucleos = obter_nucleos_disponiveis()
+        nucleos_workers = nucleos[1:] or nucleos or [None]
+        if len(nucleos) > 1:
+            fixar_afinidade(0, nucleos[:1])
+        
+        try:
             for num_workers in contagens_workers:
-                print(f"\nTestando tamanho {largura}x{altura} com {num_workers} workers...")
-                print(f"Iniciando {num_workers} workers...")
-                
-                processos_workers = []
-                porta = porta_inicial
-                
-                for i in range(num_workers):
-                    proc = subprocess.Popen(
-                        [sys.executable, 'distribuido.py', 'worker', 'localhost', str(porta)],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                    processos_workers.append(proc)
-                
-                time.sleep(1)
-                
-                tempo_execucao = executar_servidor_distribuido(
-                    largura, altura, iteracoes, num_workers, porta, detalhado=True
+                novos_workers = num_workers - len(sockets_workers)
+                print(f"\nIniciando {novos_workers} workers (total: {num_workers})...")
+                processos_workers.extend(
+                    self._iniciar_worker(porta_inicial, f'worker_{i}.log', nucleos_workers[i % len(nucleos_workers)])
+                    for i in range(len(processos_workers), num_workers)
                 )
+                sockets_workers.extend(aceitar_workers(socket_servidor, novos_workers, self.detalhado))
                 
-                for proc in processos_workers:
-                    proc.wait()
-                
-                self.resultados.append({
-                    'versao': 'distribuido',
-                    'largura': largura,
-                    'altura': altura,
-                    'iteracoes': iteracoes,
-                    'threads': 1,
-                    'workers': num_workers,
-                    'tempo_execucao': tempo_execucao
-                })
+                for largura, altura in tamanhos:
+                    print(f"\nTestando tamanho {largura}x{altura} com {num_workers} workers...")
+                    tempo_execucao, tempo_stdev = medir_repeticoes(
+                        partial(executar_simulacao_com_workers, memoria_compartilhada=self.memoria_compartilhada),
+                        (largura, altura, iteracoes, sockets_workers[:num_workers]),
+                        self.repeticoes,
+                        self.detalhado,
+                        self.aquecimento,
+                        self.opcoes_simulacao
+                    )
+                    print(f"  Mediana de {self.repeticoes} repetições: {tempo_execucao:.4f} segundos "
+                          f"(desvio padrão: {tempo_stdev:.4f})")
+                    
+                    self._registrar_resultado({
+                        'versao': 'distribuido',
+                        'largura': largura,
+                        'altura': altura,
+                        'iteracoes': iteracoes,
+                        'threads': 1,
+                        'workers': num_workers,
+                        'tempo_execucao': tempo_execucao,
+                        'tempo_stdev': tempo_stdev
+                    })
+        finally:
+            encerrar_workers(sockets_workers)
+            socket_servidor.close()
+            aguardar_processos(processos_workers)
+            fixar_afinidade(0, nucleos)
     
     def salvar_resultados(self, nome_arquivo='resultados_benchmark.json'):
         caminho_arquivo = os.path.join(self.diretorio_saida, nome_arquivo)
-        with open(caminho_arquivo, 'w') as f:
-            json.dump(self.resultados, f, indent=2)
+        with open(caminho_arquivo, 'wb') as f:
+            if orjson:
+                f.write(orjson.dumps(list(self.resultados), option=orjson.OPT_INDENT_2))
+            else:
+                f.write(json.dumps(list(self.resultados), indent=2).encode())
         print(f"\nResultados salvos em {caminho_arquivo}")
     
-    def salvar_csv(self, nome_arquivo='resultados_benchmark.csv'):
-        caminho_arquivo = os.path.join(self.diretorio_saida, nome_arquivo)
-        if not self.resultados:
+    def salvar_csv(self):
+        if self.arquivo_csv is None:
             return
         
-        nomes_campos = ['versao', 'largura', 'altura', 'iteracoes', 'threads', 'workers', 'tempo_execucao']
-        with open(caminho_arquivo, 'w', newline='') as f:
-            escritor = csv.DictWriter(f, fieldnames=nomes_campos)
-            escritor.writeheader()
-            escritor.writerows(self.resultados)
-        print(f"Resultados CSV salvos em {caminho_arquivo}")
+        self.arquivo_csv.close()
+        print(f"Resultados CSV salvos em {self.arquivo_csv.name}")
+        self.arquivo_csv = None
+        self.escritor_csv = None
     
     def gerar_tabela_comparativa(self):
         if not self.resultados:
@@ -133,34 +364,41 @@ class ExecutorBenchmark:
         print(f"{'Versão':<15} {'Tamanho':<15} {'Threads':<10} {'Workers':<15} {'Tempo (s)':<15}")
         print("-"*80)
         
-        for resultado in self.resultados:
-            tamanho_str = f"{resultado['largura']}x{resultado['altura']}"
-            print(f"{resultado['versao']:<15} {tamanho_str:<15} {resultado['threads']:<10} "
-                  f"{resultado['workers']:<15} {resultado['tempo_execucao']:<15.4f}")
+        colunas = self.resultados.colunas
+        for versao, largura, altura, threads, workers, tempo_execucao in zip(
+            colunas['versao'], colunas['largura'], colunas['altura'],
+            colunas['threads'], colunas['workers'], colunas['tempo_execucao']
+        ):
+            tamanho_str = f"{largura}x{altura}"
+            print(f"{versao:<15} {tamanho_str:<15} {threads:<10} "
+                  f"{workers:<15} {tempo_execucao:<15.4f}")
     
     def plotar_tamanho_vs_tempo(self):
         if not self.resultados:
             return
         
-        fig, ax = plt.subplots(figsize=(10, 6))
+        plt = _obter_plt()
+        fig = plt.figure(figsize=(10, 6), constrained_layout=True)
+        ax = fig.add_subplot(111)
         
         versoes = ['sequencial', 'paralelo', 'distribuido']
         cores = {'sequencial': 'blue', 'paralelo': 'green', 'distribuido': 'red'}
         
+        coluna_versoes = self.resultados.coluna('versao')
+        areas = self.resultados.coluna('largura') * self.resultados.coluna('altura')
+        tempos = self.resultados.coluna('tempo_execucao')
+        
         for versao in versoes:
-            resultados_versao = [r for r in self.resultados if r['versao'] == versao]
-            if not resultados_versao:
+            mascara = coluna_versoes == versao
+            if not mascara.any():
                 continue
             
-            if versao == 'paralelo':
-                resultados_versao = [r for r in resultados_versao if r['threads'] == max(set(r['threads'] for r in resultados_versao))]
-            elif versao == 'distribuido':
-                resultados_versao = [r for r in resultados_versao if r['workers'] == max(set(r['workers'] for r in resultados_versao))]
-            
-            tamanhos = [r['largura'] * r['altura'] for r in resultados_versao]
-            tempos = [r['tempo_execucao'] for r in resultados_versao]
+            campo_recurso = {'paralelo': 'threads', 'distribuido': 'workers'}.get(versao)
+            if campo_recurso:
+                recursos = self.resultados.coluna(campo_recurso)
+                mascara &= recursos == recursos[mascara].max()
             
-            ax.plot(tamanhos, tempos, marker='o', label=versao, color=cores[versao])
+            ax.plot(areas[mascara], tempos[mascara], marker='o', label=versao, color=cores[versao])
         
         ax.set_xlabel('Tamanho do Problema (largura × altura)')
         ax.set_ylabel('Tempo de Execução (segundos)')
@@ -168,106 +406,112 @@ class ExecutorBenchmark:
         ax.legend()
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
         caminho_arquivo = os.path.join(self.diretorio_saida, 'tamanho_vs_tempo.png')
-        plt.savefig(caminho_arquivo, dpi=300)
+        fig.savefig(caminho_arquivo, dpi=300)
         print(f"Gráfico salvo em {caminho_arquivo}")
-        plt.close()
+        plt.close(fig)
     
-    def plotar_threads_vs_speedup(self):
-        resultados_paralelos = [r for r in self.resultados if r['versao'] == 'paralelo']
-        if not resultados_paralelos:
+    def _plotar_speedup(self, versao, campo_recurso, rotulo_eixo, titulo, nome_arquivo):
+        versoes = self.resultados.coluna('versao')
+        mascara_versao = versoes == versao
+        if not mascara_versao.any():
             return
         
-        tamanhos = set((r['largura'], r['altura']) for r in resultados_paralelos)
+        larguras = self.resultados.coluna('largura')
+        alturas = self.resultados.coluna('altura')
+        recursos = self.resultados.coluna(campo_recurso)
+        tempos = self.resultados.coluna('tempo_execucao')
+        
+        sequenciais = versoes == 'sequencial'
+        tempos_sequenciais = dict(zip(
+            zip(larguras[sequenciais].tolist(), alturas[sequenciais].tolist()),
+            tempos[sequenciais].tolist()
+        ))
+        tamanhos = dict.fromkeys(zip(larguras[mascara_versao].tolist(), alturas[mascara_versao].tolist()))
         
-        fig, ax = plt.subplots(figsize=(10, 6))
+        plt = _obter_plt()
+        fig = plt.figure(figsize=(10, 6), constrained_layout=True)
+        ax = fig.add_subplot(111)
         
         for largura, altura in tamanhos:
-            resultados_tamanho = [r for r in resultados_paralelos 
-                          if r['largura'] == largura and r['altura'] == altura]
-            resultados_tamanho.sort(key=lambda x: x['threads'])
-            
-            tempo_sequencial = next(
-                (r['tempo_execucao'] for r in self.resultados 
-                 if r['versao'] == 'sequencial' and r['largura'] == largura and r['altura'] == altura),
-                None
-            )
-            
+            tempo_sequencial = tempos_sequenciais.get((largura, altura))
             if not tempo_sequencial:
                 continue
             
-            threads = [r['threads'] for r in resultados_tamanho]
-            speedups = [tempo_sequencial / r['tempo_execucao'] for r in resultados_tamanho]
+            mascara = mascara_versao & (larguras == largura) & (alturas == altura)
+            recursos_tamanho = recursos[mascara]
+            ordem = np.argsort(recursos_tamanho, kind='stable')
+            speedups = tempo_sequencial / tempos[mascara][ordem]
             
             rotulo = f"{largura}x{altura}"
-            ax.plot(threads, speedups, marker='o', label=rotulo)
+            ax.plot(recursos_tamanho[ordem], speedups, marker='o', label=rotulo)
         
-        ax.set_xlabel('Número de Threads')
+        ax.set_xlabel(rotulo_eixo)
         ax.set_ylabel('Speedup')
-        ax.set_title('Speedup vs Número de Threads (Paralelo)')
+        ax.set_title(titulo)
         ax.legend()
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        caminho_arquivo = os.path.join(self.diretorio_saida, 'threads_vs_speedup.png')
-        plt.savefig(caminho_arquivo, dpi=300)
+        caminho_arquivo = os.path.join(self.diretorio_saida, nome_arquivo)
+        fig.savefig(caminho_arquivo, dpi=300)
         print(f"Gráfico salvo em {caminho_arquivo}")
-        plt.close()
+        plt.close(fig)
+    
+    def plotar_threads_vs_speedup(self):
+        self._plotar_speedup(
+            'paralelo', 'threads', 'Número de Threads',
+            'Speedup vs Número de Threads (Paralelo)', 'threads_vs_speedup.png'
+        )
     
     def plotar_workers_vs_speedup(self):
-        resultados_distribuidos = [r for r in self.resultados if r['versao'] == 'distribuido']
-        if not resultados_distribuidos:
-            return
-        
-        tamanhos = set((r['largura'], r['altura']) for r in resultados_distribuidos)
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        for largura, altura in tamanhos:
-            resultados_tamanho = [r for r in resultados_distribuidos 
-                          if r['largura'] == largura and r['altura'] == altura]
-            resultados_tamanho.sort(key=lambda x: x['workers'])
-            
-            tempo_sequencial = next(
-                (r['tempo_execucao'] for r in self.resultados 
-                 if r['versao'] == 'sequencial' and r['largura'] == largura and r['altura'] == altura),
-                None
-            )
-            
-            if not tempo_sequencial:
-                continue
-            
-            workers = [r['workers'] for r in resultados_tamanho]
-            speedups = [tempo_sequencial / r['tempo_execucao'] for r in resultados_tamanho]
-            
-            rotulo = f"{largura}x{altura}"
-            ax.plot(workers, speedups, marker='o', label=rotulo)
-        
-        ax.set_xlabel('Número de Workers')
-        ax.set_ylabel('Speedup')
-        ax.set_title('Speedup vs Número de Workers (Distribuído)')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        caminho_arquivo = os.path.join(self.diretorio_saida, 'workers_vs_speedup.png')
-        plt.savefig(caminho_arquivo, dpi=300)
-        print(f"Gráfico salvo em {caminho_arquivo}")
-        plt.close()
+        self._plotar_speedup(
+            'distribuido', 'workers', 'Número de Workers',
+            'Speedup vs Número de Workers (Distribuído)', 'workers_vs_speedup.png'
+        )
+
+
+def _ler_info_linux():
+    processador = ''
+    nucleos = set()
+    id_fisico = None
+    with open('/proc/cpuinfo') as f:
+        for linha in f:
+            chave, _, valor = linha.partition(':')
+            chave = chave.strip()
+            if chave == 'model name' and not processador:
+                processador = valor.strip()
+            elif chave == 'physical id':
+                id_fisico = valor.strip()
+            elif chave == 'core id':
+                nucleos.add((id_fisico, valor.strip()))
+    
+    with open('/proc/meminfo') as f:
+        memoria_kb = int(next(f).split()[1])
+    
+    return processador, len(nucleos) or os.cpu_count(), memoria_kb * 1024
 
 
+@lru_cache(maxsize=1)
 def obter_info_sistema():
     import platform
-    import psutil
+    
+    if sys.platform.startswith('linux'):
+        processador, nucleos_fisicos, memoria_total = _ler_info_linux()
+        threads_logicas = os.cpu_count()
+    else:
+        import psutil
+        processador = platform.processor()
+        nucleos_fisicos = psutil.cpu_count(logical=False)
+        threads_logicas = psutil.cpu_count(logical=True)
+        memoria_total = psutil.virtual_memory().total
     
     info = {
         'SO': platform.system(),
         'Versao SO': platform.version(),
-        'CPU': platform.processor(),
-        'Nucleos CPU': psutil.cpu_count(logical=False),
-        'Threads CPU': psutil.cpu_count(logical=True),
-        'Memoria (GB)': round(psutil.virtual_memory().total / (1024**3), 2),
+        'CPU': processador,
+        'Nucleos CPU': nucleos_fisicos,
+        'Threads CPU': threads_logicas,
+        'Memoria (GB)': round(memoria_total / (1024**3), 2),
         'Versao Python': platform.python_version()
     }
     
@@ -290,6 +534,23 @@ def main():
                        help='Executar apenas benchmark paralelo')
     parser.add_argument('--distributed', action='store_true',
                        help='Executar apenas benchmark distribuído')
+    parser.add_argument('--repeats', type=int, default=5,
+                       help='Número de repetições por configuração (reporta a mediana)')
+    parser.add_argument('--warmup', type=int, default=1,
+                       help='Execuções de aquecimento descartadas antes de cada configuração')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Processos simultâneos nas varreduras sequencial e paralela (padrão: 1; valores maiores '
+                            'disputam banda de memória e cache e distorcem o speedup)')
+    parser.add_argument('--dtype', choices=['float32', 'float64'], default=None,
+                       help='Precisão da grade (padrão: float64, ou float32 com --fixed-iterations)')
+    parser.add_argument('--fixed-iterations', action='store_true',
+                       help='Executar sempre todas as iterações, sem teste de convergência')
+    parser.add_argument('--shared', action='store_true',
+                       help='Trocar os dados com os workers locais por memória compartilhada em vez de TCP')
+    parser.add_argument('--debug', action='store_true',
+                       help='Gravar a saída dos workers distribuídos em arquivos de log')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Exibir o resumo detalhado de cada simulação')
     parser.add_argument('--output-dir', type=str, default='resultados',
                        help='Diretório para salvar resultados')
     
@@ -306,7 +567,10 @@ def main():
     for chave, valor in info_sistema.items():
         print(f"{chave}: {valor}")
     
-    executor = ExecutorBenchmark(args.output_dir)
+    executor = ExecutorBenchmark(
+        args.output_dir, args.repeats, args.jobs, args.debug, args.verbose, args.warmup, args.shared, args.dtype,
+        args.fixed_iterations
+    )
     
     if executar_todos or args.sequential:
         executor.executar_benchmark_sequencial(tamanhos, args.iterations)
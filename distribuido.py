@@ -1,98 +1,316 @@
 import numpy as np
+import ipaddress
+import mmap
+import os
+import selectors
 import socket
 import struct
-import pickle
 import time
 import threading
+from multiprocessing import shared_memory, resource_tracker
 from typing import List, Tuple, Optional
 
 
+TAMANHO_BUFFER_SOCKET = 1 << 20
+FLAGS_RECEBIMENTO = getattr(socket, 'MSG_WAITALL', 0)
+CABECALHO = struct.Struct('=cIId')
+CONFIGURACAO_COMPARTILHADA = struct.Struct('=cII64s64s')
+TIPO_COMPARTILHADO = b'C'
+TIPO_PASSO = b'P'
+TAMANHO_PAGINA_GRANDE = 2 * 1024 * 1024
+DIRETORIO_MEMORIA_COMPARTILHADA = '/dev/shm'
+
+_memorias_criadas = set()
+
+
+def _configurar_socket(socket_conexao: socket.socket):
+    socket_conexao.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    socket_conexao.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, TAMANHO_BUFFER_SOCKET)
+    socket_conexao.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, TAMANHO_BUFFER_SOCKET)
+
+
+def _receber_exato(socket_origem: socket.socket, destino):
+    visao = memoryview(destino)
+    if not visao.nbytes:
+        return
+    
+    visao = visao.cast('B')
+    recebidos = 0
+    while recebidos < len(visao):
+        n = socket_origem.recv_into(visao[recebidos:], 0, FLAGS_RECEBIMENTO)
+        if not n:
+            raise ConnectionError("Conexão fechada durante recebimento")
+        recebidos += n
+
+
+def _visoes_bytes(partes):
+    visoes = [memoryview(parte) for parte in partes]
+    return [visao.cast('B') for visao in visoes if visao.nbytes]
+
+
+def _enviar_vetorizado(socket_destino: socket.socket, partes):
+    if not hasattr(socket_destino, 'sendmsg'):
+        for parte in partes:
+            socket_destino.sendall(parte)
+        return
+    
+    visoes = _visoes_bytes(partes)
+    while visoes:
+        enviados = socket_destino.sendmsg(visoes)
+        while visoes and enviados >= len(visoes[0]):
+            enviados -= len(visoes.pop(0))
+        if visoes:
+            visoes[0] = visoes[0][enviados:]
+
+
+def _receber_vetorizado(socket_origem: socket.socket, partes):
+    if not hasattr(socket_origem, 'recvmsg_into'):
+        for parte in partes:
+            _receber_exato(socket_origem, parte)
+        return
+    
+    visoes = _visoes_bytes(partes)
+    while visoes:
+        recebidos = socket_origem.recvmsg_into(visoes, 0, FLAGS_RECEBIMENTO)[0]
+        if not recebidos:
+            raise ConnectionError("Conexão fechada durante recebimento")
+        while visoes and recebidos >= len(visoes[0]):
+            recebidos -= len(visoes.pop(0))
+        if visoes:
+            visoes[0] = visoes[0][recebidos:]
+
+
+def _enviar_array(socket_destino: socket.socket, dados: np.ndarray, valor=0.0):
+    _enviar_vetorizado(socket_destino, (CABECALHO.pack(dados.dtype.char.encode(), *dados.shape, valor), dados))
+
+
+def _receber_cabecalho(socket_origem: socket.socket, cabecalho: bytearray):
+    _receber_exato(socket_origem, cabecalho)
+    tipo, linhas, colunas, valor = CABECALHO.unpack(cabecalho)
+    return tipo, (linhas, colunas), valor
+
+
+def _conexao_local(socket_conexao: socket.socket):
+    return ipaddress.ip_address(socket_conexao.getpeername()[0]).is_loopback
+
+
+def _abrir_memoria_compartilhada(nome):
+    try:
+        return shared_memory.SharedMemory(name=nome, track=False)
+    except TypeError:
+        memoria = shared_memory.SharedMemory(name=nome)
+        if nome in _memorias_criadas:
+            return memoria
+        
+        try:
+            resource_tracker.unregister(memoria._name, 'shared_memory')
+        except (AttributeError, KeyError):
+            pass
+        return memoria
+
+
+def _mapear_paginas_grandes(memoria: shared_memory.SharedMemory) -> Optional[mmap.mmap]:
+    if not hasattr(mmap, 'MADV_HUGEPAGE') or memoria.size < TAMANHO_PAGINA_GRANDE:
+        return None
+    
+    try:
+        descritor = os.open(os.path.join(DIRETORIO_MEMORIA_COMPARTILHADA, memoria.name), os.O_RDWR)
+    except OSError:
+        return None
+    
+    try:
+        mapa = mmap.mmap(descritor, memoria.size)
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(descritor)
+    
+    try:
+        mapa.madvise(mmap.MADV_HUGEPAGE)
+    except OSError:
+        pass
+    return mapa
+
+
+def _dif_maxima(novos_valores: np.ndarray, valores_antigos: np.ndarray, rascunho: np.ndarray):
+    if not novos_valores.size:
+        return 0.0
+    
+    np.subtract(novos_valores, valores_antigos, out=rascunho)
+    np.abs(rascunho, out=rascunho)
+    return float(rascunho.max())
+
+
+def aplicar_estencil(grade_fatia: np.ndarray, destino: np.ndarray) -> np.ndarray:
+    np.add(grade_fatia[0:-2, 1:-1], grade_fatia[2:, 1:-1], out=destino)
+    destino += grade_fatia[1:-1, 0:-2]
+    destino += grade_fatia[1:-1, 2:]
+    destino *= 0.25
+    return destino
+
+
 class DifusaoCalorDistribuida:
     
-    def __init__(self, largura, altura, temp_inicial=0.0, temp_borda=100.0):
+    def __init__(self, largura, altura, temp_inicial=0.0, temp_borda=100.0, dtype=np.float64,
+                 memoria_compartilhada=False):
         self.largura = largura
         self.altura = altura
         self.temp_inicial = temp_inicial
         self.temp_borda = temp_borda
         
-        self.grade = np.full((altura, largura), temp_inicial, dtype=np.float64)
+        self.grade = np.full((altura, largura), temp_inicial, dtype=dtype)
+        self.nova_grade = np.empty_like(self.grade)
         
-        self.grade[0, :] = temp_borda
-        self.grade[-1, :] = temp_borda
-        self.grade[:, 0] = temp_borda
-        self.grade[:, -1] = temp_borda
+        for grade in (self.grade, self.nova_grade):
+            grade[0, :] = temp_borda
+            grade[-1, :] = temp_borda
+            grade[:, 0] = temp_borda
+            grade[:, -1] = temp_borda
         
-        self.nova_grade = self.grade.copy()
+        self.memorias: List[shared_memory.SharedMemory] = []
+        self.mapas: List[mmap.mmap] = []
+        self.indice_grade = 0
+        if memoria_compartilhada:
+            self._mapear_memoria_compartilhada()
         
         self.workers: List[socket.socket] = []
         self.faixas_workers: List[Tuple[int, int]] = []
+        self.buffers_recebimento: List[np.ndarray] = []
+        self.cabecalho = bytearray(CABECALHO.size)
+        self.seletor = selectors.DefaultSelector()
+    
+    def _mapear_memoria_compartilhada(self):
+        grades = []
+        for grade in (self.grade, self.nova_grade):
+            memoria = shared_memory.SharedMemory(create=True, size=max(1, grade.nbytes))
+            _memorias_criadas.add(memoria.name)
+            mapa = _mapear_paginas_grandes(memoria)
+            if mapa is not None:
+                self.mapas.append(mapa)
+            grade_compartilhada = np.ndarray(
+                grade.shape, dtype=grade.dtype, buffer=memoria.buf if mapa is None else mapa
+            )
+            grade_compartilhada[:] = grade
+            self.memorias.append(memoria)
+            grades.append(grade_compartilhada)
+        
+        self.grade, self.nova_grade = grades
     
     def adicionar_worker(self, socket_worker: socket.socket, linha_inicio: int, linha_fim: int):
         self.workers.append(socket_worker)
         self.faixas_workers.append((linha_inicio, linha_fim))
+        self.seletor.register(socket_worker, selectors.EVENT_READ, len(self.workers) - 1)
+        
+        if self.memorias:
+            socket_worker.sendall(
+                CABECALHO.pack(TIPO_COMPARTILHADO, self.altura, self.largura, 0.0)
+                + CONFIGURACAO_COMPARTILHADA.pack(
+                    self.grade.dtype.char.encode(), linha_inicio, linha_fim,
+                    *(memoria.name.encode() for memoria in self.memorias)
+                )
+            )
+        else:
+            self.buffers_recebimento.append(
+                np.empty((linha_fim - linha_inicio, self.largura - 2), dtype=self.grade.dtype)
+            )
     
-    def _enviar_fatia_grade(self, socket_worker: socket.socket, linha_inicio: int, linha_fim: int):
+    def _enviar_fatia_grade(self, socket_worker: socket.socket, linha_inicio: int, linha_fim: int, verificar=True):
         inicio_envio = max(0, linha_inicio - 1)
         fim_envio = min(self.altura, linha_fim + 1)
         
-        dados_fatia = self.grade[inicio_envio:fim_envio, :].copy()
-        
-        dados = pickle.dumps(dados_fatia, protocol=pickle.HIGHEST_PROTOCOL)
-        tamanho = len(dados)
-        
-        socket_worker.sendall(struct.pack('!I', tamanho))
-        socket_worker.sendall(dados)
+        _enviar_array(socket_worker, self.grade[inicio_envio:fim_envio, :], float(verificar))
     
-    def _receber_fatia_grade(self, socket_worker: socket.socket, linha_inicio: int, linha_fim: int):
-        dados_tamanho = socket_worker.recv(4)
-        if len(dados_tamanho) < 4:
-            raise ConnectionError("Falha ao receber tamanho dos dados")
+    def _receber_fatia_grade(self, indice: int, linha_inicio: int, linha_fim: int):
+        socket_worker = self.workers[indice]
+        dados_fatia = self.buffers_recebimento[indice]
         
-        tamanho = struct.unpack('!I', dados_tamanho)[0]
+        _receber_vetorizado(socket_worker, (self.cabecalho, dados_fatia))
+        tipo, linhas, colunas, dif_maxima = CABECALHO.unpack(self.cabecalho)
+        if tipo != dados_fatia.dtype.char.encode() or (linhas, colunas) != dados_fatia.shape:
+            raise ConnectionError("Formato de fatia inesperado")
         
-        dados = b''
-        while len(dados) < tamanho:
-            pedaco = socket_worker.recv(tamanho - len(dados))
-            if not pedaco:
-                raise ConnectionError("Conexão fechada durante recebimento")
-            dados += pedaco
-        
-        dados_fatia = pickle.loads(dados)
+        self.nova_grade[linha_inicio:linha_fim, 1:-1] = dados_fatia
+        return dif_maxima
+    
+    def _atualizar_compartilhado(self, verificar=True):
+        for socket_worker in self.workers:
+            socket_worker.sendall(CABECALHO.pack(TIPO_PASSO, self.indice_grade, 0, float(verificar)))
         
-        inicio_real = max(1, linha_inicio)
-        fim_real = min(self.altura - 1, linha_fim)
-        fatia_inicio = inicio_real - (linha_inicio - 1 if linha_inicio > 0 else 0)
-        fatia_fim = fatia_inicio + (fim_real - inicio_real)
+        dif_maxima = 0.0
+        pendentes = len(self.workers)
+        while pendentes:
+            for chave, _ in self.seletor.select():
+                tipo, _, dif_worker = _receber_cabecalho(chave.fileobj, self.cabecalho)
+                if tipo != TIPO_PASSO:
+                    raise ConnectionError("Resposta inesperada do worker")
+                dif_maxima = max(dif_maxima, dif_worker)
+                pendentes -= 1
         
-        self.nova_grade[inicio_real:fim_real, 1:-1] = dados_fatia[fatia_inicio:fatia_fim, 1:-1]
+        self.grade, self.nova_grade = self.nova_grade, self.grade
+        self.indice_grade ^= 1
+        return dif_maxima if verificar else float('inf')
     
-    def atualizar(self):
-        for socket_worker, (linha_inicio, linha_fim) in zip(self.workers, self.faixas_workers):
-            self._enviar_fatia_grade(socket_worker, linha_inicio, linha_fim)
+    def atualizar(self, verificar=True):
+        if self.memorias:
+            return self._atualizar_compartilhado(verificar)
         
         for socket_worker, (linha_inicio, linha_fim) in zip(self.workers, self.faixas_workers):
-            self._receber_fatia_grade(socket_worker, linha_inicio, linha_fim)
+            self._enviar_fatia_grade(socket_worker, linha_inicio, linha_fim, verificar)
+        
+        dif_maxima = 0.0
+        pendentes = len(self.workers)
+        while pendentes:
+            for chave, _ in self.seletor.select():
+                linha_inicio, linha_fim = self.faixas_workers[chave.data]
+                dif_maxima = max(dif_maxima, self._receber_fatia_grade(chave.data, linha_inicio, linha_fim))
+                pendentes -= 1
         
         self.grade, self.nova_grade = self.nova_grade, self.grade
+        return dif_maxima if verificar else float('inf')
     
-    def simular(self, iteracoes, limite_convergencia=1e-6):
+    def simular(self, iteracoes, limite_convergencia=1e-6, verificar_a_cada=10):
+        if limite_convergencia is None:
+            for _ in range(iteracoes):
+                self.atualizar(False)
+            return iteracoes
+        
+        verificar_a_cada = max(1, verificar_a_cada)
         for iteracao in range(iteracoes):
-            grade_antiga = self.grade.copy()
-            self.atualizar()
-            
-            dif_maxima = np.max(np.abs(self.grade - grade_antiga))
+            dif_maxima = self.atualizar((iteracao + 1) % verificar_a_cada == 0)
             if dif_maxima < limite_convergencia:
                 return iteracao + 1
         
         return iteracoes
     
-    def obter_grade(self):
-        return self.grade.copy()
+    def obter_grade(self, copia=True):
+        if copia:
+            return self.grade.copy()
+        
+        visao = self.grade.view()
+        visao.flags.writeable = False
+        return visao
     
     def obter_temp_media(self):
         return np.mean(self.grade[1:-1, 1:-1])
     
+    def liberar(self):
+        self.seletor.close()
+        if not self.memorias:
+            return
+        
+        self.grade = self.grade.copy()
+        self.nova_grade = self.nova_grade.copy()
+        for mapa in self.mapas:
+            mapa.close()
+        self.mapas = []
+        for memoria in self.memorias:
+            memoria.close()
+            memoria.unlink()
+            _memorias_criadas.discard(memoria.name)
+        self.memorias = []
+    
     def fechar(self):
+        self.liberar()
         for socket_worker in self.workers:
             try:
                 socket_worker.close()
@@ -107,94 +325,197 @@ class WorkerDistribuido:
         self.host = host
         self.porta = porta
         self.socket: Optional[socket.socket] = None
+        self.grade_fatia: Optional[np.ndarray] = None
+        self.nova_fatia: Optional[np.ndarray] = None
+        self.dif_fatia: Optional[np.ndarray] = None
+        self.cabecalho = bytearray(CABECALHO.size)
+        self.memorias: List[shared_memory.SharedMemory] = []
+        self.mapas: List[mmap.mmap] = []
+        self.grades_compartilhadas: List[np.ndarray] = []
+        self.faixa = (0, 0)
+        self.dif_compartilhada: Optional[np.ndarray] = None
+    
+    def conectar(self, tempo_limite=2.0):
+        prazo = time.monotonic() + tempo_limite
+        while True:
+            try:
+                self.socket = socket.create_connection((self.host, self.porta), timeout=0.05)
+                self.socket.settimeout(None)
+                _configurar_socket(self.socket)
+                return
+            except OSError:
+                if time.monotonic() >= prazo:
+                    raise
+                time.sleep(0.05)
+    
+    def _anexar_memoria_compartilhada(self, forma):
+        configuracao = bytearray(CONFIGURACAO_COMPARTILHADA.size)
+        _receber_exato(self.socket, configuracao)
+        tipo, linha_inicio, linha_fim, *nomes = CONFIGURACAO_COMPARTILHADA.unpack(configuracao)
+        
+        self._liberar_memoria_compartilhada()
+        tipo = np.dtype(tipo.decode())
+        self.memorias = [_abrir_memoria_compartilhada(nome.rstrip(b'\0').decode()) for nome in nomes]
+        self.grades_compartilhadas = []
+        for memoria in self.memorias:
+            mapa = _mapear_paginas_grandes(memoria)
+            if mapa is not None:
+                self.mapas.append(mapa)
+            self.grades_compartilhadas.append(
+                np.ndarray(forma, dtype=tipo, buffer=memoria.buf if mapa is None else mapa)
+            )
+        self.faixa = (linha_inicio, linha_fim)
+        self.dif_compartilhada = np.empty((linha_fim - linha_inicio, max(0, forma[1] - 2)), dtype=tipo)
     
-    def conectar(self):
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.connect((self.host, self.porta))
+    def _liberar_memoria_compartilhada(self):
+        self.grades_compartilhadas = []
+        for mapa in self.mapas:
+            mapa.close()
+        self.mapas = []
+        for memoria in self.memorias:
+            memoria.close()
+        self.memorias = []
+    
+    def _processar_passo_compartilhado(self, indice, verificar):
+        linha_inicio, linha_fim = self.faixa
+        grade = self.grades_compartilhadas[indice]
+        nova_fatia = self.grades_compartilhadas[1 - indice][linha_inicio:linha_fim, 1:-1]
+        
+        aplicar_estencil(grade[linha_inicio - 1:linha_fim + 1], nova_fatia)
+        dif_maxima = 0.0
+        if verificar:
+            dif_maxima = _dif_maxima(nova_fatia, grade[linha_inicio:linha_fim, 1:-1], self.dif_compartilhada)
+        
+        self.socket.sendall(CABECALHO.pack(TIPO_PASSO, 0, 0, dif_maxima))
+        return nova_fatia
     
     def processar_fatia(self):
-        dados_tamanho = self.socket.recv(4)
-        if len(dados_tamanho) < 4:
-            raise ConnectionError("Falha ao receber tamanho dos dados")
+        tipo, forma, verificar = _receber_cabecalho(self.socket, self.cabecalho)
+        if tipo == TIPO_COMPARTILHADO:
+            self._anexar_memoria_compartilhada(forma)
+            return self.processar_fatia()
         
-        tamanho = struct.unpack('!I', dados_tamanho)[0]
+        if tipo == TIPO_PASSO:
+            return self._processar_passo_compartilhado(forma[0], verificar)
         
-        dados = b''
-        while len(dados) < tamanho:
-            pedaco = self.socket.recv(tamanho - len(dados))
-            if not pedaco:
-                raise ConnectionError("Conexão fechada durante recebimento")
-            dados += pedaco
+        if forma == (0, 0):
+            return None
         
-        grade_fatia = pickle.loads(dados)
-        altura, largura = grade_fatia.shape
+        tipo = np.dtype(tipo.decode())
+        if self.grade_fatia is None or self.grade_fatia.shape != forma or self.grade_fatia.dtype != tipo:
+            self.grade_fatia = np.empty(forma, dtype=tipo)
+            self.nova_fatia = np.empty((forma[0] - 2, forma[1] - 2), dtype=tipo)
+            self.dif_fatia = np.empty_like(self.nova_fatia)
         
-        nova_fatia = grade_fatia.copy()
+        grade_fatia = self.grade_fatia
+        _receber_exato(self.socket, grade_fatia)
         
-        nova_fatia[1:-1, 1:-1] = 0.25 * (
-            grade_fatia[0:-2, 1:-1] +
-            grade_fatia[2:, 1:-1] +
-            grade_fatia[1:-1, 0:-2] +
-            grade_fatia[1:-1, 2:]
-        )
+        nova_fatia = aplicar_estencil(grade_fatia, self.nova_fatia)
         
-        dados_resultado = pickle.dumps(nova_fatia, protocol=pickle.HIGHEST_PROTOCOL)
-        tamanho_resultado = len(dados_resultado)
+        dif_maxima = 0.0
+        if verificar:
+            dif_maxima = _dif_maxima(nova_fatia, grade_fatia[1:-1, 1:-1], self.dif_fatia)
         
-        self.socket.sendall(struct.pack('!I', tamanho_resultado))
-        self.socket.sendall(dados_resultado)
+        _enviar_array(self.socket, nova_fatia, dif_maxima)
         
         return nova_fatia
     
     def fechar(self):
+        self._liberar_memoria_compartilhada()
         if self.socket:
             self.socket.close()
 
 
-def executar_servidor_distribuido(largura, altura, iteracoes, num_workers, porta=8888, detalhado=True):
-    socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    socket_servidor.bind(('localhost', porta))
-    socket_servidor.listen(num_workers)
-    
-    if detalhado:
-        print(f"Aguardando {num_workers} workers conectarem na porta {porta}...")
+def aceitar_workers(socket_servidor: socket.socket, num_workers, detalhado=True) -> List[socket.socket]:
+    sockets_workers = []
+    for i in range(num_workers):
+        socket_worker, addr = socket_servidor.accept()
+        _configurar_socket(socket_worker)
+        if detalhado:
+            print(f"Worker {i+1} conectado de {addr}")
+        sockets_workers.append(socket_worker)
     
-    simulacao = DifusaoCalorDistribuida(largura, altura)
+    return sockets_workers
+
+
+def encerrar_workers(sockets_workers: List[socket.socket]):
+    for socket_worker in sockets_workers:
+        try:
+            _enviar_array(socket_worker, np.empty((0, 0)))
+        except OSError:
+            pass
+        finally:
+            socket_worker.close()
+
+
+def executar_simulacao_com_workers(largura, altura, iteracoes, sockets_workers: List[socket.socket], detalhado=True,
+                                   memoria_compartilhada=False, limite_convergencia=1e-6, dtype=None):
+    num_workers = len(sockets_workers)
+    memoria_compartilhada = memoria_compartilhada and all(map(_conexao_local, sockets_workers))
+    dtype = dtype or (np.float32 if limite_convergencia is None else np.float64)
+    simulacao = DifusaoCalorDistribuida(largura, altura, dtype=dtype, memoria_compartilhada=memoria_compartilhada)
     
     linhas_por_worker = (altura - 2) // num_workers
     resto = (altura - 2) % num_workers
     
-    linha_inicio = 1
-    for i in range(num_workers):
-        socket_worker, addr = socket_servidor.accept()
-        if detalhado:
-            print(f"Worker {i+1} conectado de {addr}")
+    try:
+        linha_inicio = 1
+        for i, socket_worker in enumerate(sockets_workers):
+            linhas = linhas_por_worker + (1 if i < resto else 0)
+            linha_fim = linha_inicio + linhas
+            
+            simulacao.adicionar_worker(socket_worker, linha_inicio, linha_fim)
+            linha_inicio = linha_fim
         
-        linhas = linhas_por_worker + (1 if i < resto else 0)
-        linha_fim = linha_inicio + linhas
+        if detalhado:
+            print("Todos os workers conectados. Iniciando simulação...\n")
         
-        simulacao.adicionar_worker(socket_worker, linha_inicio, linha_fim)
-        linha_inicio = linha_fim
-    
-    if detalhado:
-        print("Todos os workers conectados. Iniciando simulação...\n")
-    
-    tempo_inicio = time.time()
-    iteracoes_reais = simulacao.simular(iteracoes)
-    tempo_fim = time.time()
-    tempo_execucao = tempo_fim - tempo_inicio
+        tempo_inicio = time.perf_counter_ns()
+        iteracoes_reais = simulacao.simular(iteracoes, limite_convergencia)
+        tempo_fim = time.perf_counter_ns()
+    except BaseException:
+        simulacao.fechar()
+        raise
+    finally:
+        simulacao.liberar()
+    tempo_execucao = (tempo_fim - tempo_inicio) / 1e9
     
     if detalhado:
         print(f"Simulação Distribuída:")
         print(f"  Tamanho: {largura}x{altura}")
         print(f"  Workers: {num_workers}")
+        if memoria_compartilhada:
+            print(f"  Memória compartilhada: sim")
         print(f"  Iterações: {iteracoes_reais}")
         print(f"  Tempo de execução: {tempo_execucao:.4f} segundos")
         print(f"  Temperatura média: {simulacao.obter_temp_media():.4f}°C")
     
-    simulacao.fechar()
-    socket_servidor.close()
+    return tempo_execucao
+
+
+def criar_servidor(porta=8888, num_workers=1):
+    socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    socket_servidor.bind(('localhost', porta))
+    socket_servidor.listen(num_workers)
+    return socket_servidor
+
+
+def executar_servidor_distribuido(largura, altura, iteracoes, num_workers, porta=8888, detalhado=True,
+                                  memoria_compartilhada=False):
+    socket_servidor = criar_servidor(porta, num_workers)
+    
+    if detalhado:
+        print(f"Aguardando {num_workers} workers conectarem na porta {porta}...")
+    
+    sockets_workers = aceitar_workers(socket_servidor, num_workers, detalhado)
+    try:
+        tempo_execucao = executar_simulacao_com_workers(
+            largura, altura, iteracoes, sockets_workers, detalhado, memoria_compartilhada
+        )
+    finally:
+        encerrar_workers(sockets_workers)
+        socket_servidor.close()
     
     return tempo_execucao
 
@@ -210,7 +531,8 @@ def executar_worker_distribuido(host='localhost', porta=8888, iteracoes=None):
                 break
             
             try:
-                worker.processar_fatia()
+                if worker.processar_fatia() is None:
+                    break
                 iteracao += 1
             except (ConnectionError, EOFError):
                 break
@@ -5,9 +5,14 @@ from typing import List
 import numpy as np
 
 
+BYTES_POR_BLOCO = 1024 * 1024
+PASSOS_TEMPORAIS = 4
+
+
 class DifusaoCalorParalela:
 
-    def __init__(self, largura, altura, num_threads, temp_inicial=0.0, temp_borda=100.0):
+    def __init__(self, largura, altura, num_threads, temp_inicial=0.0, temp_borda=100.0,
+                 passos_temporais=PASSOS_TEMPORAIS, dtype=np.float64):
         self.largura = largura
         self.altura = altura
         linhas_uteis = max(1, altura - 2)
@@ -15,21 +20,35 @@ class DifusaoCalorParalela:
         self.temp_inicial = temp_inicial
         self.temp_borda = temp_borda
 
-        self.grade = np.full((altura, largura), temp_inicial, dtype=np.float64)
-
-        self.grade[0, :] = temp_borda
-        self.grade[-1, :] = temp_borda
-        self.grade[:, 0] = temp_borda
-        self.grade[:, -1] = temp_borda
-
-        self.nova_grade = self.grade.copy()
-
-        self.barreira_inicio = threading.Barrier(self.num_threads + 1)
-        self.barreira_fim = threading.Barrier(self.num_threads + 1)
-        self.evento_parada = threading.Event()
-        self.difs_max_locais = [0.0] * self.num_threads
+        self.grade = np.full((altura, largura), temp_inicial, dtype=dtype)
+        self.nova_grade = np.empty_like(self.grade)
+
+        for grade in (self.grade, self.nova_grade):
+            grade[0, :] = temp_borda
+            grade[-1, :] = temp_borda
+            grade[:, 0] = temp_borda
+            grade[:, -1] = temp_borda
+
+        self.trava = threading.Lock()
+        self.condicao_inicio = threading.Condition(self.trava)
+        self.condicao_fim = threading.Condition(self.trava)
+        self.epoca = 0
+        self.threads_concluidas = 0
+        self.parar = False
+        self.passos_temporais = max(1, passos_temporais)
+        self.iteracoes_reais = 0
+        self.limite_convergencia = 1e-6
+        self.verificar_a_cada = 1
+        self.verificar_todos = True
+        self.passos_epoca = 0
+        self.difs_max_locais = [[0.0]] * self.num_threads
+        self.difs_rodada = [0.0]
+        self.controle_rodada = None
+        self.erro_rodada = None
+        self.barreira_rodada = threading.Barrier(self.num_threads, action=self._concluir_rodada)
 
         self.faixas_threads = self._calcular_faixas_threads()
+        self.linhas_bloco = max(1, BYTES_POR_BLOCO // (3 * self.grade.itemsize * max(1, largura)))
 
         self.threads: List[threading.Thread] = []
         self._iniciar_workers()
@@ -51,86 +70,218 @@ class DifusaoCalorParalela:
         return faixas
 
     def _iniciar_workers(self):
+        self.parar = False
         for id_thread, (linha_inicio, linha_fim) in enumerate(self.faixas_threads):
             thread = threading.Thread(
                 target=self._loop_worker,
-                args=(id_thread, linha_inicio, linha_fim),
+                args=(id_thread, linha_inicio, linha_fim, self.epoca),
                 daemon=True,
             )
             self.threads.append(thread)
             thread.start()
 
-    def _atualizar_regiao(self, linha_inicio, linha_fim):
-        if linha_inicio >= linha_fim:
-            return 0.0
+    def _verificar_passo(self, passo):
+        if self.verificar_todos:
+            return True
+        return self.limite_convergencia is not None and (self.iteracoes_reais + passo) % self.verificar_a_cada == 0
+
+    def _aplicar_estencil(self, grade, inicio, fim, rascunho):
+        novos_valores = rascunho[: fim - inicio]
+        np.add(grade[inicio - 1 : fim - 1, 1:-1], grade[inicio + 1 : fim + 1, 1:-1], out=novos_valores)
+        novos_valores += grade[inicio:fim, 0:-2]
+        novos_valores += grade[inicio:fim, 2:]
+        novos_valores *= 0.25
+        return novos_valores
+
+    def _atualizar_regiao(self, linha_inicio, linha_fim, rascunho, verificar=True):
+        dif_maxima = 0.0 if verificar else float('inf')
+        for bloco_inicio in range(linha_inicio, linha_fim, self.linhas_bloco):
+            bloco_fim = min(bloco_inicio + self.linhas_bloco, linha_fim)
+            novos_valores = self._aplicar_estencil(self.grade, bloco_inicio, bloco_fim, rascunho)
+            valores_antigos = self.grade[bloco_inicio:bloco_fim, 1:-1]
+            self.nova_grade[bloco_inicio:bloco_fim, 1:-1] = novos_valores
+            if verificar and valores_antigos.size:
+                novos_valores -= valores_antigos
+                np.abs(novos_valores, out=novos_valores)
+                dif_maxima = max(dif_maxima, float(novos_valores.max()))
 
-        novos_valores = 0.25 * (
-            self.grade[linha_inicio - 1 : linha_fim - 1, 1:-1]
-            + self.grade[linha_inicio + 1 : linha_fim + 1, 1:-1]
-            + self.grade[linha_inicio:linha_fim, 0:-2]
-            + self.grade[linha_inicio:linha_fim, 2:]
-        )
-        valores_antigos = self.grade[linha_inicio:linha_fim, 1:-1]
-        self.nova_grade[linha_inicio:linha_fim, 1:-1] = novos_valores
-        return float(np.max(np.abs(novos_valores - valores_antigos))) if valores_antigos.size else 0.0
+        return dif_maxima
 
-    def _loop_worker(self, id_thread, linha_inicio, linha_fim):
+    def _atualizar_regiao_temporal(self, linha_inicio, linha_fim, passos, buffers, rascunho):
+        verificacoes = [self._verificar_passo(passo) for passo in range(1, passos + 1)]
+        difs_maximas = [0.0 if verificar else float('inf') for verificar in verificacoes]
+        for bloco_inicio in range(linha_inicio, linha_fim, self.linhas_bloco):
+            bloco_fim = min(bloco_inicio + self.linhas_bloco, linha_fim)
+            topo = max(0, bloco_inicio - passos)
+            base = min(self.altura, bloco_fim + passos)
+
+            atual = self.grade[topo:base]
+            for buffer in buffers:
+                buffer[: base - topo, 0] = atual[:, 0]
+                buffer[: base - topo, -1] = atual[:, -1]
+                if topo == 0:
+                    buffer[0] = atual[0]
+                if base == self.altura:
+                    buffer[base - topo - 1] = atual[-1]
+
+            for passo in range(1, passos + 1):
+                proximo = buffers[(passo - 1) % 2][: base - topo]
+                inicio = max(1, bloco_inicio - passos + passo) - topo
+                fim = min(self.altura - 1, bloco_fim + passos - passo) - topo
+                novos_valores = self._aplicar_estencil(atual, inicio, fim, rascunho)
+                proximo[inicio:fim, 1:-1] = novos_valores
+                if verificacoes[passo - 1] and novos_valores.size:
+                    dif = novos_valores[bloco_inicio - topo - inicio : bloco_fim - topo - inicio]
+                    dif -= atual[bloco_inicio - topo : bloco_fim - topo, 1:-1]
+                    np.abs(dif, out=dif)
+                    difs_maximas[passo - 1] = max(difs_maximas[passo - 1], float(dif.max()))
+                atual = proximo
+
+            self.nova_grade[bloco_inicio:bloco_fim, 1:-1] = atual[bloco_inicio - topo : bloco_fim - topo, 1:-1]
+
+        return difs_maximas
+
+    def _loop_worker(self, id_thread, linha_inicio, linha_fim, epoca_vista):
+        buffers = None
+        rascunho = np.empty(
+            (self.linhas_bloco + 2 * self.passos_temporais, max(0, self.largura - 2)), dtype=self.grade.dtype
+        )
         while True:
-            self.barreira_inicio.wait()
-            if self.evento_parada.is_set():
-                self.barreira_fim.wait()
-                break
-
-            self.difs_max_locais[id_thread] = self._atualizar_regiao(linha_inicio, linha_fim)
+            with self.condicao_inicio:
+                while self.epoca == epoca_vista:
+                    self.condicao_inicio.wait()
+                epoca_vista = self.epoca
+                if self.parar:
+                    break
 
-            self.barreira_fim.wait()
+            try:
+                while self.passos_epoca:
+                    passos = self.passos_epoca
+                    if passos == 1:
+                        self.difs_max_locais[id_thread] = [
+                            self._atualizar_regiao(linha_inicio, linha_fim, rascunho, self._verificar_passo(1))
+                        ]
+                    else:
+                        if buffers is None:
+                            forma = (self.linhas_bloco + 2 * self.passos_temporais, self.largura)
+                            buffers = (
+                                np.empty(forma, dtype=self.grade.dtype),
+                                np.empty(forma, dtype=self.grade.dtype),
+                            )
+                        self.difs_max_locais[id_thread] = self._atualizar_regiao_temporal(
+                            linha_inicio, linha_fim, passos, buffers, rascunho
+                        )
+
+                    self.barreira_rodada.wait()
+            except threading.BrokenBarrierError:
+                pass
+            except BaseException as erro:
+                with self.trava:
+                    if self.erro_rodada is None:
+                        self.erro_rodada = erro
+                self.barreira_rodada.abort()
+
+            with self.condicao_fim:
+                self.threads_concluidas += 1
+                if self.threads_concluidas == self.num_threads:
+                    self.condicao_fim.notify()
 
     def _parar_workers(self):
-        self.evento_parada.set()
-        self.barreira_inicio.wait()
-        self.barreira_fim.wait()
+        if not self.threads:
+            return
+
+        with self.condicao_inicio:
+            self.parar = True
+            self.epoca += 1
+            self.condicao_inicio.notify_all()
 
         for thread in self.threads:
             thread.join()
+        self.threads = []
+
+    def _concluir_rodada(self):
+        self.difs_rodada = [max(difs) for difs in zip(*self.difs_max_locais)]
+        self.passos_epoca = self.controle_rodada()
+
+    def _avancar(self, passos, controle, verificar_todos=False):
+        with self.condicao_inicio:
+            self.threads_concluidas = 0
+            self.verificar_todos = verificar_todos
+            self.controle_rodada = controle
+            self.passos_epoca = passos
+            self.epoca += 1
+            self.condicao_inicio.notify_all()
+            while self.threads_concluidas < self.num_threads:
+                self.condicao_fim.wait()
+
+            erro, self.erro_rodada = self.erro_rodada, None
+        if erro is not None:
+            self.barreira_rodada.reset()
+            raise erro
 
     def atualizar(self):
-        self.barreira_inicio.wait()
-        self.barreira_fim.wait()
-
-        dif_maxima = max(self.difs_max_locais) if self.difs_max_locais else 0.0
+        if not self.threads:
+            self._iniciar_workers()
+        self._avancar(1, lambda: 0, verificar_todos=True)
 
         self.grade, self.nova_grade = self.nova_grade, self.grade
-        return dif_maxima
+        return self.difs_rodada[0]
 
-    def simular(self, iteracoes, limite_convergencia=1e-6):
-        iteracoes_reais = 0
-        try:
-            for iteracao in range(iteracoes):
-                dif_maxima = self.atualizar()
-                iteracoes_reais = iteracao + 1
+    def _controlar_simulacao(self):
+        convergiu = [
+            self.limite_convergencia is not None and dif < self.limite_convergencia for dif in self.difs_rodada
+        ]
+        if True in convergiu[:-1]:
+            return convergiu.index(True) + 1
 
-                if dif_maxima < limite_convergencia:
-                    break
+        self.grade, self.nova_grade = self.nova_grade, self.grade
+        self.iteracoes_reais += len(convergiu)
+
+        if convergiu[-1]:
+            return 0
+        return min(self.passos_temporais, self.iteracoes_alvo - self.iteracoes_reais)
+
+    def simular(self, iteracoes, limite_convergencia=1e-6, verificar_a_cada=10):
+        self.iteracoes_reais = 0
+        self.iteracoes_alvo = iteracoes
+        self.limite_convergencia = limite_convergencia
+        self.verificar_a_cada = max(1, verificar_a_cada)
+        if not self.threads:
+            self._iniciar_workers()
+        try:
+            if iteracoes > 0:
+                self._avancar(min(self.passos_temporais, iteracoes), self._controlar_simulacao)
         finally:
             self._parar_workers()
 
-        return iteracoes_reais
+        return self.iteracoes_reais
+
+    def obter_grade(self, copia=True):
+        if copia:
+            return self.grade.copy()
+
+        visao = self.grade.view()
+        visao.flags.writeable = False
+        return visao
 
-    def obter_grade(self):
-        return self.grade.copy()
+    def fechar(self):
+        self._parar_workers()
 
     def obter_temp_media(self):
         return np.mean(self.grade[1:-1, 1:-1])
 
 
-def executar_simulacao_paralela(largura, altura, iteracoes, num_threads, detalhado=True):
-    tempo_inicio = time.time()
+def executar_simulacao_paralela(
+    largura, altura, iteracoes, num_threads, detalhado=True, limite_convergencia=1e-6, dtype=None
+):
+    tempo_inicio = time.perf_counter_ns()
 
-    simulacao = DifusaoCalorParalela(largura, altura, num_threads)
-    iteracoes_reais = simulacao.simular(iteracoes)
+    dtype = dtype or (np.float32 if limite_convergencia is None else np.float64)
+    simulacao = DifusaoCalorParalela(largura, altura, num_threads, dtype=dtype)
+    iteracoes_reais = simulacao.simular(iteracoes, limite_convergencia)
 
-    tempo_fim = time.time()
-    tempo_execucao = tempo_fim - tempo_inicio
+    tempo_fim = time.perf_counter_ns()
+    tempo_execucao = (tempo_fim - tempo_inicio) / 1e9
 
     if detalhado:
         print(f"Simulacao Paralela:")
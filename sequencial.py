@@ -2,59 +2,215 @@ import numpy as np
 import time
 
 
+BYTES_POR_BLOCO = 1024 * 1024
+PASSOS_TEMPORAIS = 8
+
+
 class DifusaoCalorSequencial:
     
-    def __init__(self, largura, altura, temp_inicial=0.0, temp_borda=100.0):
+    def __init__(self, largura, altura, temp_inicial=0.0, temp_borda=100.0, dtype=np.float64):
         self.largura = largura
         self.altura = altura
         self.temp_inicial = temp_inicial
         self.temp_borda = temp_borda
         
-        self.grade = np.full((altura, largura), temp_inicial, dtype=np.float64)
+        self.grade = np.full((altura, largura), temp_inicial, dtype=dtype)
+        self.nova_grade = np.empty_like(self.grade)
         
-        self.grade[0, :] = temp_borda
-        self.grade[-1, :] = temp_borda
-        self.grade[:, 0] = temp_borda
-        self.grade[:, -1] = temp_borda
+        for grade in (self.grade, self.nova_grade):
+            grade[0, :] = temp_borda
+            grade[-1, :] = temp_borda
+            grade[:, 0] = temp_borda
+            grade[:, -1] = temp_borda
+        self.linhas_bloco = max(1, BYTES_POR_BLOCO // (3 * self.grade.itemsize * max(1, largura)))
+        self.rascunho = np.empty((min(self.linhas_bloco, max(0, altura - 2)), max(0, largura - 2)), dtype=dtype)
+        self.visoes_blocos = []
+    
+    def _calcular_visoes_blocos(self, grade, nova_grade):
+        visoes = []
+        for inicio in range(1, self.altura - 1, self.linhas_bloco):
+            fim = min(inicio + self.linhas_bloco, self.altura - 1)
+            visoes.append((
+                grade[inicio - 1:fim - 1, 1:-1], grade[inicio + 1:fim + 1, 1:-1],
+                grade[inicio:fim, 0:-2], grade[inicio:fim, 2:],
+                grade[inicio:fim, 1:-1], nova_grade[inicio:fim, 1:-1], self.rascunho[:fim - inicio]
+            ))
+        return visoes
+    
+    def _obter_visoes_blocos(self):
+        for grade, nova_grade, visoes in self.visoes_blocos:
+            if grade is self.grade and nova_grade is self.nova_grade:
+                return visoes
         
-        self.nova_grade = self.grade.copy()
-    
-    def atualizar(self):
-        self.nova_grade[1:-1, 1:-1] = 0.25 * (
-            self.grade[0:-2, 1:-1] +
-            self.grade[2:, 1:-1] +
-            self.grade[1:-1, 0:-2] +
-            self.grade[1:-1, 2:]
-        )
+        self.visoes_blocos = [
+            (self.grade, self.nova_grade, self._calcular_visoes_blocos(self.grade, self.nova_grade)),
+            (self.nova_grade, self.grade, self._calcular_visoes_blocos(self.nova_grade, self.grade))
+        ]
+        return self.visoes_blocos[0][2]
+    
+    def atualizar(self, verificar=True):
+        dif_maxima = 0.0 if verificar else float('inf')
+        for norte, sul, oeste, leste, centro, destino, novos_valores in self._obter_visoes_blocos():
+            np.add(norte, sul, out=novos_valores)
+            novos_valores += oeste
+            novos_valores += leste
+            novos_valores *= 0.25
+            destino[...] = novos_valores
+            
+            if verificar and novos_valores.size:
+                novos_valores -= centro
+                np.abs(novos_valores, out=novos_valores)
+                dif_maxima = max(dif_maxima, float(novos_valores.max()))
         
         self.grade, self.nova_grade = self.nova_grade, self.grade
+        return dif_maxima
     
-    def simular(self, iteracoes, limite_convergencia=1e-6):
+    def simular(self, iteracoes, limite_convergencia=1e-6, verificar_a_cada=10):
+        if limite_convergencia is None:
+            for _ in range(iteracoes):
+                self.atualizar(False)
+            return iteracoes
+        
+        verificar_a_cada = max(1, verificar_a_cada)
         for iteracao in range(iteracoes):
-            grade_antiga = self.grade.copy()
-            self.atualizar()
+            dif_maxima = self.atualizar((iteracao + 1) % verificar_a_cada == 0)
+            if dif_maxima < limite_convergencia:
+                return iteracao + 1
+        
+        return iteracoes
+    
+    def _avancar_temporal(self, verificacoes, buffers, rascunho):
+        passos = len(verificacoes)
+        difs_maximas = [0.0 if verificar else float('inf') for verificar in verificacoes]
+        for bloco_inicio in range(1, self.altura - 1, self.linhas_bloco):
+            bloco_fim = min(bloco_inicio + self.linhas_bloco, self.altura - 1)
+            topo = max(0, bloco_inicio - passos)
+            base = min(self.altura, bloco_fim + passos)
+            
+            atual = self.grade[topo:base]
+            for buffer in buffers:
+                buffer[:base - topo, 0] = atual[:, 0]
+                buffer[:base - topo, -1] = atual[:, -1]
+                if topo == 0:
+                    buffer[0] = atual[0]
+                if base == self.altura:
+                    buffer[base - topo - 1] = atual[-1]
             
-            dif_maxima = np.max(np.abs(self.grade - grade_antiga))
+            for passo in range(1, passos + 1):
+                proximo = buffers[(passo - 1) % 2][:base - topo]
+                inicio = max(1, bloco_inicio - passos + passo) - topo
+                fim = min(self.altura - 1, bloco_fim + passos - passo) - topo
+                
+                novos_valores = rascunho[:fim - inicio]
+                np.add(atual[inicio - 1:fim - 1, 1:-1], atual[inicio + 1:fim + 1, 1:-1], out=novos_valores)
+                novos_valores += atual[inicio:fim, 0:-2]
+                novos_valores += atual[inicio:fim, 2:]
+                novos_valores *= 0.25
+                proximo[inicio:fim, 1:-1] = novos_valores
+                
+                if verificacoes[passo - 1] and novos_valores.size:
+                    dif = novos_valores[bloco_inicio - topo - inicio:bloco_fim - topo - inicio]
+                    dif -= atual[bloco_inicio - topo:bloco_fim - topo, 1:-1]
+                    np.abs(dif, out=dif)
+                    difs_maximas[passo - 1] = max(difs_maximas[passo - 1], float(dif.max()))
+                atual = proximo
+            
+            self.nova_grade[bloco_inicio:bloco_fim, 1:-1] = atual[bloco_inicio - topo:bloco_fim - topo, 1:-1]
+        
+        return difs_maximas
+    
+    def simular_temporal(self, iteracoes, limite_convergencia=1e-6, verificar_a_cada=10,
+                         passos_temporais=PASSOS_TEMPORAIS):
+        verificar_a_cada = max(1, verificar_a_cada)
+        passos_temporais = max(1, passos_temporais)
+        verificar = limite_convergencia is not None
+        
+        forma = (self.linhas_bloco + 2 * passos_temporais, self.largura)
+        buffers = (np.empty(forma, dtype=self.grade.dtype), np.empty(forma, dtype=self.grade.dtype))
+        rascunho = np.empty((forma[0], max(0, self.largura - 2)), dtype=self.grade.dtype)
+        
+        iteracoes_reais = 0
+        while iteracoes_reais < iteracoes:
+            passos = min(passos_temporais, iteracoes - iteracoes_reais)
+            verificacoes = [
+                verificar and (iteracoes_reais + passo) % verificar_a_cada == 0 for passo in range(1, passos + 1)
+            ]
+            convergiu = [
+                verificar and dif < limite_convergencia for dif in self._avancar_temporal(verificacoes, buffers, rascunho)
+            ]
+            if True in convergiu[:-1]:
+                passos = convergiu.index(True) + 1
+                self._avancar_temporal(verificacoes[:passos], buffers, rascunho)
+            
+            self.grade, self.nova_grade = self.nova_grade, self.grade
+            iteracoes_reais += passos
+            
+            if convergiu[passos - 1]:
+                break
+        
+        return iteracoes_reais
+    
+    def _atualizar_cor(self, linha_inicial, coluna_inicial, verificar):
+        altura, largura = self.altura, self.largura
+        centro = self.grade[linha_inicial:altura - 1:2, coluna_inicial:largura - 1:2]
+        novos_valores = 0.25 * (
+            self.grade[linha_inicial - 1:altura - 2:2, coluna_inicial:largura - 1:2] +
+            self.grade[linha_inicial + 1:altura:2, coluna_inicial:largura - 1:2] +
+            self.grade[linha_inicial:altura - 1:2, coluna_inicial - 1:largura - 2:2] +
+            self.grade[linha_inicial:altura - 1:2, coluna_inicial + 1:largura:2]
+        )
+        
+        dif_maxima = 0.0
+        if verificar and novos_valores.size:
+            np.subtract(centro, novos_valores, out=centro)
+            np.abs(centro, out=centro)
+            dif_maxima = float(centro.max())
+        
+        centro[...] = novos_valores
+        return dif_maxima
+    
+    def atualizar_vermelho_preto(self, verificar=True):
+        difs = [
+            self._atualizar_cor(linha_inicial, coluna_inicial, verificar)
+            for linha_inicial, coluna_inicial in ((1, 1), (2, 2), (1, 2), (2, 1))
+        ]
+        return max(difs) if verificar else float('inf')
+    
+    def simular_vermelho_preto(self, iteracoes, limite_convergencia=1e-6, verificar_a_cada=10):
+        if limite_convergencia is None:
+            for _ in range(iteracoes):
+                self.atualizar_vermelho_preto(False)
+            return iteracoes
+        
+        verificar_a_cada = max(1, verificar_a_cada)
+        for iteracao in range(iteracoes):
+            dif_maxima = self.atualizar_vermelho_preto((iteracao + 1) % verificar_a_cada == 0)
             if dif_maxima < limite_convergencia:
                 return iteracao + 1
         
         return iteracoes
     
-    def obter_grade(self):
-        return self.grade.copy()
+    def obter_grade(self, copia=True):
+        if copia:
+            return self.grade.copy()
+        
+        visao = self.grade.view()
+        visao.flags.writeable = False
+        return visao
     
     def obter_temp_media(self):
         return np.mean(self.grade[1:-1, 1:-1])
 
 
-def executar_simulacao_sequencial(largura, altura, iteracoes, detalhado=True):
-    tempo_inicio = time.time()
+def executar_simulacao_sequencial(largura, altura, iteracoes, detalhado=True, limite_convergencia=1e-6, dtype=None):
+    tempo_inicio = time.perf_counter_ns()
     
-    simulacao = DifusaoCalorSequencial(largura, altura)
-    iteracoes_reais = simulacao.simular(iteracoes)
+    dtype = dtype or (np.float32 if limite_convergencia is None else np.float64)
+    simulacao = DifusaoCalorSequencial(largura, altura, dtype=dtype)
+    iteracoes_reais = simulacao.simular(iteracoes, limite_convergencia)
     
-    tempo_fim = time.time()
-    tempo_execucao = tempo_fim - tempo_inicio
+    tempo_fim = time.perf_counter_ns()
+    tempo_execucao = (tempo_fim - tempo_inicio) / 1e9
     
     if detalhado:
         print(f"Simulação Sequencial:")